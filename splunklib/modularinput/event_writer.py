@@ -13,9 +13,9 @@
 # under the License.
 
 import sys
+import xml.etree.ElementTree as ET
 
 from splunklib.utils import ensure_str
-from .event import ET
 
 
 class EventWriter:
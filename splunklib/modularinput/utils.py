@@ -28,25 +28,23 @@ def xml_compare(expected, found):
         return True
 
     # compare element attributes, ignoring order
-    if set(expected.items()) != set(found.items()):
+    if expected.attrib != found.attrib:
         return False
 
     # check for equal number of children
-    expected_children = list(expected)
-    found_children = list(found)
-    if len(expected_children) != len(found_children):
+    if len(expected) != len(found):
         return False
 
-    # compare children
-    if not all(xml_compare(a, b) for a, b in zip(expected_children, found_children)):
-        return False
+    # compare elements before descending; if there is no text node, only the children have to match
+    expected_text = expected.text
+    found_text = found.text
+    if (expected_text is not None and expected_text.strip() != "") \
+        or (found_text is not None and found_text.strip() != ""):
+        if expected.tag != found.tag or expected_text != found_text:
+            return False
 
-    # compare elements, if there is no text node, return True
-    if (expected.text is None or expected.text.strip() == "") \
-        and (found.text is None or found.text.strip() == ""):
-        return True
-    return expected.tag == found.tag and expected.text == found.text \
-            and expected.attrib == found.attrib
+    # compare children
+    return all(xml_compare(a, b) for a, b in zip(expected, found))
 
 def parse_parameters(param_node):
     if param_node.tag == "param":
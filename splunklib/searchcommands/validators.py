@@ -350,6 +350,10 @@ class Map(Validator):
 class Match(Validator):
     """ Validates that a value matches a regular expression pattern.
 
+    The `pattern` may be a string or a precompiled regular expression. A precompiled pattern is used as is, so one
+    compiled pattern can be shared between validators. It keeps its own flags: `flags` must be left at its default
+    of 0 in that case, or :class:`ValueError` is raised.
+
     """
     def __init__(self, name, pattern, flags=0):
         self.name = str(name)
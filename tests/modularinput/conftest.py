@@ -0,0 +1,27 @@
+# Copyright © 2011-2024 Splunk, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"): you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import io
+
+import pytest
+
+from splunklib.modularinput.event_writer import EventWriter
+
+
+@pytest.fixture
+def ew_buffers():
+    """Yields an ``EventWriter`` bound to in-memory output and error buffers,
+    along with the two buffers."""
+    out, err = io.StringIO(), io.StringIO()
+    yield EventWriter(out, err), out, err
@@ -18,10 +18,52 @@ import io
 import os
 import sys
 import unittest
+import xml.etree.ElementTree as ET
+from functools import lru_cache
+from itertools import zip_longest
 
 sys.path.insert(0, os.path.join('../../splunklib', '..'))
 
 from splunklib.modularinput.utils import xml_compare, parse_xml_data, parse_parameters
 
+def data_path(filepath):
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), filepath)
+
+@lru_cache(maxsize=None)
+def _read_bytes(path, mtime):
+    with io.open(path, 'rb') as data:
+        return data.read()
+
 def data_open(filepath):
-    return io.open(os.path.join(os.path.dirname(os.path.abspath(__file__)), filepath), 'rb')
+    path = data_path(filepath)
+    return io.BytesIO(_read_bytes(path, os.path.getmtime(path)))
+
+@lru_cache(maxsize=None)
+def _parse_root(path, mtime):
+    return ET.parse(path).getroot()
+
+def cached_root(filepath):
+    # Parsed once per (path, mtime); the returned element is shared, don't mutate it.
+    path = data_path(filepath)
+    return _parse_root(path, os.path.getmtime(path))
+
+def _iter_nodes(source):
+    # Start and end events together carry the tree structure. Text is only complete
+    # at the end event; like xml_compare, blank text is ignored and other text is
+    # compared as is.
+    for event, elem in ET.iterparse(source, events=('start', 'end')):
+        if event == 'start':
+            yield event, elem.tag, dict(elem.attrib)
+        else:
+            text = elem.text
+            yield event, elem.tag, text if text is not None and text.strip() != "" else None
+            elem.clear()
+
+def xml_compare_streaming(expected_path, found):
+    """Compares a fixture file against an XML document (``str`` or ``bytes``)
+    one element at a time, stopping at the first difference."""
+    if isinstance(found, str):
+        found = found.encode("utf-8")
+    with data_open(expected_path) as expected:
+        pairs = zip_longest(_iter_nodes(expected), _iter_nodes(io.BytesIO(found)))
+        return all(a == b for a, b in pairs)
@@ -16,11 +16,12 @@
 
 
 import sys
+import xml.etree.ElementTree as ET
 
 import pytest
 
-from tests.modularinput.modularinput_testlib import xml_compare, data_open
-from splunklib.modularinput.event import Event, ET
+from tests.modularinput.modularinput_testlib import xml_compare, cached_root, data_open
+from splunklib.modularinput.event import Event
 from splunklib.modularinput.event_writer import EventWriter
 
 
@@ -108,11 +109,10 @@ def test_writing_events_on_event_writer(capsys):
     ew.close()
 
     captured = capsys.readouterr()
-    with data_open("data/stream_with_two_events.xml") as data:
-        found = ET.fromstring(first_out_part + captured.out)
-        expected = ET.parse(data).getroot()
+    found = ET.fromstring(first_out_part + captured.out)
+    expected = cached_root("data/stream_with_two_events.xml")
 
-        assert xml_compare(expected, found)
+    assert xml_compare(expected, found)
 
 def test_error_in_event_writer():
     """An event which cannot write itself onto an output stream
@@ -125,16 +125,15 @@ def test_error_in_event_writer():
         ew.write_event(e)
     assert str(excinfo.value) == "Events must have at least the data field set to be written to XML."
 
-def test_logging_errors_with_event_writer(capsys):
+def test_logging_errors_with_event_writer(ew_buffers):
     """Check that the log method on EventWriter produces the
     expected error message."""
 
-    ew = EventWriter(sys.stdout, sys.stderr)
+    ew, out, err = ew_buffers
 
     ew.log(EventWriter.ERROR, "Something happened!")
 
-    captured = capsys.readouterr()
-    assert captured.err == "ERROR Something happened!\n"
+    assert err.getvalue() == "ERROR Something happened!\n"
 
 def test_write_xml_is_sane(capsys):
     """Check that EventWriter.write_xml_document writes sensible
@@ -14,7 +14,7 @@
 # under the License.
 
 import xml.etree.ElementTree as ET
-from tests.modularinput.modularinput_testlib import unittest, xml_compare, data_open
+from tests.modularinput.modularinput_testlib import unittest, xml_compare, cached_root, data_open
 from splunklib.modularinput.scheme import Scheme
 from splunklib.modularinput.argument import Argument
 
@@ -56,7 +56,7 @@ class SchemeTest(unittest.TestCase):
 
         constructed = scheme.to_xml()
 
-        expected = ET.parse(data_open("data/scheme_without_defaults.xml")).getroot()
+        expected = cached_root("data/scheme_without_defaults.xml")
 
         self.assertTrue(xml_compare(expected, constructed))
 
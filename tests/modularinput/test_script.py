@@ -1,230 +1,172 @@
-import sys
-
 import io
-import xml.etree.ElementTree as ET
-from splunklib.client import Service
-from splunklib.modularinput import Script, EventWriter, Scheme, Argument, Event
 
-from splunklib.modularinput.utils import xml_compare
-from tests.modularinput.modularinput_testlib import data_open
+import pytest
 
+from splunklib.client import Service
+from splunklib.modularinput import Script, Scheme, Argument, Event
 
-TEST_SCRIPT_PATH = "__IGNORED_SCRIPT_PATH__"
+from tests.modularinput.modularinput_testlib import data_open, xml_compare_streaming
 
 
-def test_error_on_script_with_null_scheme(capsys):
-    """A script that returns a null scheme should generate no output on
-    stdout and an error on stderr saying that it the scheme was null."""
-
-    # Override abstract methods
-    class NewScript(Script):
-        def get_scheme(self):
-            return None
+TEST_SCRIPT_PATH = "__IGNORED_SCRIPT_PATH__"
 
-        def stream_events(self, inputs, ew):
-            # not used
-            return
 
-    script = NewScript()
+class _ConfigurableScript(Script):
+    """A ``Script`` whose overridable methods are supplied as callables, each
+    taking the script itself as its first argument. Missing callables make
+    ``get_scheme`` return ``None`` and the other methods do nothing."""
 
-    ew = EventWriter(sys.stdout, sys.stderr)
+    def __init__(self, get_scheme=None, validate_input=None, stream_events=None):
+        super().__init__()
+        self._get_scheme = get_scheme
+        self._validate_input = validate_input
+        self._stream_events = stream_events
 
-    in_stream = io.StringIO()
+    def get_scheme(self):
+        return None if self._get_scheme is None else self._get_scheme(self)
 
-    args = [TEST_SCRIPT_PATH, "--scheme"]
-    return_value = script.run_script(args, ew, in_stream)
+    def validate_input(self, definition):
+        if self._validate_input is not None:
+            self._validate_input(self, definition)
 
-    captured = capsys.readouterr()
+    def stream_events(self, inputs, ew):
+        if self._stream_events is not None:
+            self._stream_events(self, inputs, ew)
 
-    assert captured.out == ""
-    assert captured.err == "FATAL Modular input script returned a null scheme.\n"
-    assert 0 != return_value
 
+@pytest.fixture
+def run_script_and_check(ew_buffers):
+    """Runs a script and checks its exit value, its error output and either its
+    plain output or, if ``expected_xml`` names a fixture file, its XML output."""
 
-def test_scheme_properly_generated_by_script(capsys):
-    """Check that a scheme generated by a script is what we expect."""
+    def run(script, args, in_stream, expected_xml=None, expected_out="", expected_err="", expected_return=0):
+        ew, out, err = ew_buffers
+        return_value = script.run_script(args, ew, in_stream)
 
-    # Override abstract methods
-    class NewScript(Script):
-        def get_scheme(self):
-            scheme = Scheme("abcd")
-            scheme.description = "\uC3BC and \uC3B6 and <&> f\u00FCr"
-            scheme.streaming_mode = scheme.streaming_mode_simple
-            scheme.use_external_validation = False
-            scheme.use_single_instance = True
+        assert err.getvalue() == expected_err
+        if expected_xml is None:
+            assert out.getvalue() == expected_out
+        else:
+            assert xml_compare_streaming(expected_xml, out.getvalue())
+        assert return_value == expected_return
 
-            arg1 = Argument("arg1")
-            scheme.add_argument(arg1)
+    return run
 
-            arg2 = Argument("arg2")
-            arg2.description = "\uC3BC and \uC3B6 and <&> f\u00FCr"
-            arg2.data_type = Argument.data_type_number
-            arg2.required_on_create = True
-            arg2.required_on_edit = True
-            arg2.validation = "is_pos_int('some_name')"
-            scheme.add_argument(arg2)
 
-            return scheme
+def test_error_on_script_with_null_scheme(run_script_and_check):
+    """A script that returns a null scheme should generate no output on
+    stdout and an error on stderr saying that it the scheme was null."""
 
-        def stream_events(self, inputs, ew):
-            # not used
-            return
+    run_script_and_check(
+        _ConfigurableScript(), [TEST_SCRIPT_PATH, "--scheme"], io.StringIO(),
+        expected_err="FATAL Modular input script returned a null scheme.\n", expected_return=1)
 
-    script = NewScript()
 
-    ew = EventWriter(sys.stdout, sys.stderr)
+def test_scheme_properly_generated_by_script(run_script_and_check):
+    """Check that a scheme generated by a script is what we expect."""
 
-    args = [TEST_SCRIPT_PATH, "--scheme"]
-    return_value = script.run_script(args, ew, sys.stderr)
+    def get_scheme(script):
+        scheme = Scheme("abcd")
+        scheme.description = "\uC3BC and \uC3B6 and <&> f\u00FCr"
+        scheme.streaming_mode = scheme.streaming_mode_simple
+        scheme.use_external_validation = False
+        scheme.use_single_instance = True
 
-    output = capsys.readouterr()
+        arg1 = Argument("arg1")
+        scheme.add_argument(arg1)
 
-    assert output.err == ""
-    assert return_value == 0
+        arg2 = Argument("arg2")
+        arg2.description = "\uC3BC and \uC3B6 and <&> f\u00FCr"
+        arg2.data_type = Argument.data_type_number
+        arg2.required_on_create = True
+        arg2.required_on_edit = True
+        arg2.validation = "is_pos_int('some_name')"
+        scheme.add_argument(arg2)
 
-    with data_open("data/scheme_without_defaults.xml") as data:
-        found = ET.fromstring(output.out)
-        expected = ET.parse(data).getroot()
+        return scheme
 
-        assert xml_compare(expected, found)
+    run_script_and_check(
+        _ConfigurableScript(get_scheme=get_scheme), [TEST_SCRIPT_PATH, "--scheme"], io.StringIO(),
+        expected_xml="data/scheme_without_defaults.xml")
 
 
-def test_successful_validation(capsys):
+def test_successful_validation(run_script_and_check):
     """Check that successful validation yield no text and a 0 exit value."""
 
-    # Override abstract methods
-    class NewScript(Script):
-        def get_scheme(self):
-            return None
-
-        def validate_input(self, definition):
-            # always succeed...
-            return
-
-        def stream_events(self, inputs, ew):
-            # unused
-            return
-
-    script = NewScript()
-
-    ew = EventWriter(sys.stdout, sys.stderr)
+    # always succeed...
+    script = _ConfigurableScript(validate_input=lambda script, definition: None)
 
-    args = [TEST_SCRIPT_PATH, "--validate-arguments"]
+    with data_open("data/validation.xml") as in_stream:
+        run_script_and_check(script, [TEST_SCRIPT_PATH, "--validate-arguments"], in_stream)
 
-    return_value = script.run_script(args, ew, data_open("data/validation.xml"))
 
-    output = capsys.readouterr()
-
-    assert output.err == ""
-    assert output.out == ""
-    assert return_value == 0
-
-
-def test_failed_validation(capsys):
+def test_failed_validation(run_script_and_check):
     """Check that failed validation writes sensible XML to stdout."""
 
-    # Override abstract methods
-    class NewScript(Script):
-        def get_scheme(self):
-            return None
-
-        def validate_input(self, definition):
-            raise ValueError("Big fat validation error!")
-
-        def stream_events(self, inputs, ew):
-            # unused
-            return
+    def validate_input(script, definition):
+        raise ValueError("Big fat validation error!")
 
-    script = NewScript()
+    with data_open("data/validation.xml") as in_stream:
+        run_script_and_check(
+            _ConfigurableScript(validate_input=validate_input), [TEST_SCRIPT_PATH, "--validate-arguments"], in_stream,
+            expected_xml="data/validation_error.xml", expected_return=1)
 
-    ew = EventWriter(sys.stdout, sys.stderr)
 
-    args = [TEST_SCRIPT_PATH, "--validate-arguments"]
-
-    return_value = script.run_script(args, ew, data_open("data/validation.xml"))
-
-    output = capsys.readouterr()
-
-    with data_open("data/validation_error.xml") as data:
-        expected = ET.parse(data).getroot()
-        found = ET.fromstring(output.out)
-
-        assert output.err == ""
-        assert xml_compare(expected, found)
-        assert return_value != 0
-
-
-def test_write_events(capsys):
+def test_write_events(run_script_and_check):
     """Check that passing an input definition and writing a couple events goes smoothly."""
 
-    # Override abstract methods
-    class NewScript(Script):
-        def get_scheme(self):
-            return None
-
-        def stream_events(self, inputs, ew):
-            event = Event(
-                data="This is a test of the emergency broadcast system.",
-                stanza="fubar",
-                time="%.3f" % 1372275124.466,
-                host="localhost",
-                index="main",
-                source="hilda",
-                sourcetype="misc",
-                done=True,
-                unbroken=True
-            )
-
-            ew.write_event(event)
-            ew.write_event(event)
-
-    script = NewScript()
-    input_configuration = data_open("data/conf_with_2_inputs.xml")
-
-    ew = EventWriter(sys.stdout, sys.stderr)
+    def stream_events(script, inputs, ew):
+        event = Event(
+            data="This is a test of the emergency broadcast system.",
+            stanza="fubar",
+            time="%.3f" % 1372275124.466,
+            host="localhost",
+            index="main",
+            source="hilda",
+            sourcetype="misc",
+            done=True,
+            unbroken=True
+        )
+
+        ew.write_event(event)
+        ew.write_event(event)
 
-    return_value = script.run_script([TEST_SCRIPT_PATH], ew, input_configuration)
-
-    output = capsys.readouterr()
-    assert output.err == ""
-    assert return_value == 0
-
-    with data_open("data/stream_with_two_events.xml") as data:
-        expected = ET.parse(data).getroot()
-        found = ET.fromstring(output.out)
-
-        assert xml_compare(expected, found)
+    with data_open("data/conf_with_2_inputs.xml") as input_configuration:
+        run_script_and_check(
+            _ConfigurableScript(stream_events=stream_events), [TEST_SCRIPT_PATH], input_configuration,
+            expected_xml="data/stream_with_two_events.xml")
 
 
-def test_service_property(capsys):
+def test_service_property(run_script_and_check):
     """ Check that Script.service returns a valid Service instance as soon
     as the stream_events method is called, but not before.
 
     """
 
-    # Override abstract methods
-    class NewScript(Script):
-        def __init__(self):
-            super().__init__()
-            self.authority_uri = None
-
-        def get_scheme(self):
-            return None
+    authority_uris = []
 
-        def stream_events(self, inputs, ew):
-            self.authority_uri = inputs.metadata['server_uri']
+    script = _ConfigurableScript(
+        stream_events=lambda script, inputs, ew: authority_uris.append(inputs.metadata['server_uri']))
 
-    script = NewScript()
     with data_open("data/conf_with_2_inputs.xml") as input_configuration:
-        ew = EventWriter(sys.stdout, sys.stderr)
-
         assert script.service is None
 
-        return_value = script.run_script(
-            [TEST_SCRIPT_PATH], ew, input_configuration)
+        run_script_and_check(script, [TEST_SCRIPT_PATH], input_configuration)
 
-        output = capsys.readouterr()
-        assert return_value == 0
-        assert output.err == ""
         assert isinstance(script.service, Service)
-        assert script.service.authority == script.authority_uri
+        assert [script.service.authority] == authority_uris
+
+
+def test_xml_compare_streaming_detects_differences(tmp_path):
+    """The streaming compare used above must catch differences in structure
+    and text, as xml_compare does."""
+
+    expected = tmp_path / "expected.xml"
+    expected.write_text("<r><x a='1'><y>text</y></x><z/></r>")
+
+    assert xml_compare_streaming(str(expected), "<r><x a='1'>\n  <y>text</y>\n</x><z/></r>")
+    assert not xml_compare_streaming(str(expected), "<r><y>text</y><x a='1'/><z/></r>")
+    assert not xml_compare_streaming(str(expected), "<r><x a='1'><y>text</y><z/></x></r>")
+    assert not xml_compare_streaming(str(expected), "<r><x a='1'><y> text</y></x><z/></r>")
+    assert not xml_compare_streaming(str(expected), "<r><x a='2'><y>text</y></x><z/></r>")
+    assert not xml_compare_streaming(str(expected), "<r><x a='1'><y>text</y></x></r>")
@@ -16,10 +16,11 @@
 # under the License.
 
 
+from functools import lru_cache
 from unittest import main, TestCase
 import sys
 
-from io import TextIOWrapper
+import re
 import pytest
 
 from splunklib.searchcommands import Configuration, Option, environment, validators
@@ -30,157 +31,173 @@ from splunklib.searchcommands.search_command import SearchCommand
 from tests.searchcommands import rebase_environment
 
 
+# Validators hold no per-option state, so options of the same kind share one instance
+_BOOLEAN = validators.Boolean()
+_CODE = validators.Code()
+_DURATION = validators.Duration()
+_FIELDNAME = validators.Fieldname()
+_FILE = validators.File()
+_INTEGER = validators.Integer()
+_FLOAT = validators.Float()
+_MAP = validators.Map(foo=1, bar=2, test=3)
+_SSN_RE = re.compile(r'\d{3}-\d{2}-\d{4}')
+_SSN = validators.Match('social security number', _SSN_RE)
+_OPTIONNAME = validators.OptionName()
+_REGULAREXPRESSION = validators.RegularExpression()
+_SET = validators.Set('foo', 'bar', 'test')
+
+
 @Configuration()
 class TestSearchCommand(SearchCommand):
     boolean = Option(
         doc='''
         **Syntax:** **boolean=***<value>*
         **Description:** A boolean value''',
-        validate=validators.Boolean())
+        validate=_BOOLEAN)
 
     required_boolean = Option(
         doc='''
         **Syntax:** **boolean=***<value>*
         **Description:** A boolean value''',
-        require=True, validate=validators.Boolean())
+        require=True, validate=_BOOLEAN)
 
     aliased_required_boolean = Option(
         doc='''
         **Syntax:** **boolean=***<value>*
         **Description:** A boolean value''',
-        name='foo', require=True, validate=validators.Boolean())
+        name='foo', require=True, validate=_BOOLEAN)
 
     code = Option(
         doc='''
         **Syntax:** **code=***<value>*
         **Description:** A Python expression, if mode == "eval", or statement, if mode == "exec"''',
-        validate=validators.Code())
+        validate=_CODE)
 
     required_code = Option(
         doc='''
         **Syntax:** **code=***<value>*
         **Description:** A Python expression, if mode == "eval", or statement, if mode == "exec"''',
-        require=True, validate=validators.Code())
+        require=True, validate=_CODE)
 
     duration = Option(
         doc='''
         **Syntax:** **duration=***<value>*
         **Description:** A length of time''',
-        validate=validators.Duration())
+        validate=_DURATION)
 
     required_duration = Option(
         doc='''
         **Syntax:** **duration=***<value>*
         **Description:** A length of time''',
-        require=True, validate=validators.Duration())
+        require=True, validate=_DURATION)
 
     fieldname = Option(
         doc='''
         **Syntax:** **fieldname=***<value>*
         **Description:** Name of a field''',
-        validate=validators.Fieldname())
+        validate=_FIELDNAME)
 
     required_fieldname = Option(
         doc='''
         **Syntax:** **fieldname=***<value>*
         **Description:** Name of a field''',
-        require=True, validate=validators.Fieldname())
+        require=True, validate=_FIELDNAME)
 
     file = Option(
         doc='''
         **Syntax:** **file=***<value>*
         **Description:** Name of a file''',
-        validate=validators.File())
+        validate=_FILE)
 
     required_file = Option(
         doc='''
         **Syntax:** **file=***<value>*
         **Description:** Name of a file''',
-        require=True, validate=validators.File())
+        require=True, validate=_FILE)
 
     integer = Option(
         doc='''
         **Syntax:** **integer=***<value>*
         **Description:** An integer value''',
-        validate=validators.Integer())
+        validate=_INTEGER)
 
     required_integer = Option(
         doc='''
         **Syntax:** **integer=***<value>*
         **Description:** An integer value''',
-        require=True, validate=validators.Integer())
+        require=True, validate=_INTEGER)
 
     float = Option(
         doc='''
         **Syntax:** **float=***<value>*
         **Description:** An float value''',
-        validate=validators.Float())
+        validate=_FLOAT)
 
     required_float = Option(
         doc='''
         **Syntax:** **float=***<value>*
         **Description:** An float value''',
-        require=True, validate=validators.Float())
+        require=True, validate=_FLOAT)
 
     map = Option(
         doc='''
         **Syntax:** **map=***<value>*
         **Description:** A mapping from one value to another''',
-        validate=validators.Map(foo=1, bar=2, test=3))
+        validate=_MAP)
 
     required_map = Option(
         doc='''
         **Syntax:** **map=***<value>*
         **Description:** A mapping from one value to another''',
-        require=True, validate=validators.Map(foo=1, bar=2, test=3))
+        require=True, validate=_MAP)
 
     match = Option(
         doc='''
         **Syntax:** **match=***<value>*
         **Description:** A value that matches a regular expression pattern''',
-        validate=validators.Match('social security number', r'\d{3}-\d{2}-\d{4}'))
+        validate=_SSN)
 
     required_match = Option(
         doc='''
         **Syntax:** **required_match=***<value>*
         **Description:** A value that matches a regular expression pattern''',
-        require=True, validate=validators.Match('social security number', r'\d{3}-\d{2}-\d{4}'))
+        require=True, validate=_SSN)
 
     optionname = Option(
         doc='''
         **Syntax:** **optionname=***<value>*
         **Description:** The name of an option (used internally)''',
-        validate=validators.OptionName())
+        validate=_OPTIONNAME)
 
     required_optionname = Option(
         doc='''
         **Syntax:** **optionname=***<value>*
         **Description:** The name of an option (used internally)''',
-        require=True, validate=validators.OptionName())
+        require=True, validate=_OPTIONNAME)
 
     regularexpression = Option(
         doc='''
         **Syntax:** **regularexpression=***<value>*
         **Description:** Regular expression pattern to match''',
-        validate=validators.RegularExpression())
+        validate=_REGULAREXPRESSION)
 
     required_regularexpression = Option(
         doc='''
         **Syntax:** **regularexpression=***<value>*
         **Description:** Regular expression pattern to match''',
-        require=True, validate=validators.RegularExpression())
+        require=True, validate=_REGULAREXPRESSION)
 
     set = Option(
         doc='''
         **Syntax:** **set=***<value>*
         **Description:** A member of a set''',
-        validate=validators.Set('foo', 'bar', 'test'))
+        validate=_SET)
 
     required_set = Option(
         doc='''
         **Syntax:** **set=***<value>*
         **Description:** A member of a set''',
-        require=True, validate=validators.Set('foo', 'bar', 'test'))
+        require=True, validate=_SET)
 
     class ConfigurationSettings(SearchCommand.ConfigurationSettings):
         @classmethod
@@ -188,118 +205,137 @@ class TestSearchCommand(SearchCommand):
             pass
 
 
+_CONFIG_CASES = [
+    ('clear_required_fields',
+     (True, False),
+     (None, 'anything other than a bool')),
+    ('distributed',
+     (True, False),
+     (None, 'anything other than a bool')),
+    ('generates_timeorder',
+     (True, False),
+     (None, 'anything other than a bool')),
+    ('generating',
+     (True, False),
+     (None, 'anything other than a bool')),
+    ('maxinputs',
+     (0, 50000, sys.maxsize),
+     (None, -1, sys.maxsize + 1, 'anything other than an int')),
+    ('overrides_timeorder',
+     (True, False),
+     (None, 'anything other than a bool')),
+    ('required_fields',
+     (['field_1', 'field_2'], set(['field_1', 'field_2']), ('field_1', 'field_2')),
+     (None, 0xdead, {'foo': 1, 'bar': 2})),
+    ('requires_preop',
+     (True, False),
+     (None, 'anything other than a bool')),
+    ('retainsevents',
+     (True, False),
+     (None, 'anything other than a bool')),
+    ('run_in_preview',
+     (True, False),
+     (None, 'anything other than a bool')),
+    ('streaming',
+     (True, False),
+     (None, 'anything other than a bool')),
+    ('streaming_preop',
+     ('some unicode string', b'some byte string'),
+     (None, 0xdead)),
+    ('type',
+     # TODO: Do we need to validate byte versions of these strings?
+     ('events', 'reporting', 'streaming'),
+     ('eventing', 0xdead))]
+
+_CONFIG_VALUES = [(name, value) for name, values, _ in _CONFIG_CASES for value in values]
+_CONFIG_ERROR_VALUES = [(name, value) for name, _, error_values in _CONFIG_CASES for value in error_values]
+
+# Settings values include lists and sets, so classes are cached by repr rather than with lru_cache
+_configuration_settings_classes = {}
+
+
+def new_configuration_settings_class(setting_name=None, setting_value=None):
+
+    key = setting_name, repr(setting_value)
+
+    try:
+        return _configuration_settings_classes[key]
+    except KeyError:
+        pass
+
+    @Configuration(**{} if setting_name is None else {setting_name: setting_value})
+    class ConfiguredSearchCommand(SearchCommand):
+        class ConfigurationSettings(SearchCommand.ConfigurationSettings):
+            clear_required_fields = ConfigurationSetting()
+            distributed = ConfigurationSetting()
+            generates_timeorder = ConfigurationSetting()
+            generating = ConfigurationSetting()
+            maxinputs = ConfigurationSetting()
+            overrides_timeorder = ConfigurationSetting()
+            required_fields = ConfigurationSetting()
+            requires_preop = ConfigurationSetting()
+            retainsevents = ConfigurationSetting()
+            run_in_preview = ConfigurationSetting()
+            streaming = ConfigurationSetting()
+            streaming_preop = ConfigurationSetting()
+            type = ConfigurationSetting()
+
+            @classmethod
+            def fix_up(cls, command_class):
+                return
+
+    settings_class = _configuration_settings_classes[key] = ConfiguredSearchCommand.ConfigurationSettings
+    return settings_class
+
+
+@pytest.mark.smoke
+@pytest.mark.parametrize('name,value', _CONFIG_VALUES)
+def test_configuration(name, value):
+
+    settings_class = new_configuration_settings_class(name, value)
+
+    # Setting property exists
+    assert isinstance(getattr(settings_class, name), property)
+
+    # Backing field exists on the settings class and it holds the correct value
+    backing_field_name = '_' + name
+    assert getattr(settings_class, backing_field_name) == value
+
+    settings_instance = settings_class(command=None)
+
+    # An instance gets its value from the settings class until a value is set on the instance
+
+    assert backing_field_name not in settings_instance.__dict__
+    assert getattr(settings_instance, name) == value
+    assert getattr(settings_instance, backing_field_name) == value
+
+    setattr(settings_instance, name, value)
+
+    assert backing_field_name in settings_instance.__dict__
+    assert getattr(settings_instance, name) == value
+    assert settings_instance.__dict__[backing_field_name] == value
+
+
+@pytest.mark.smoke
+@pytest.mark.parametrize('name,value', _CONFIG_ERROR_VALUES)
+def test_configuration_error(name, value):
+
+    with pytest.raises(ValueError):
+        new_configuration_settings_class(name, value)
+
+    settings_class = new_configuration_settings_class()
+    settings_instance = settings_class(command=None)
+
+    with pytest.raises(ValueError):
+        setattr(settings_instance, name, value)
+
+
 @pytest.mark.smoke
 class TestDecorators(TestCase):
 
     def setUp(self):
         TestCase.setUp(self)
 
-    def test_configuration(self):
-
-        def new_configuration_settings_class(setting_name=None, setting_value=None):
-
-            @Configuration(**{} if setting_name is None else {setting_name: setting_value})
-            class ConfiguredSearchCommand(SearchCommand):
-                class ConfigurationSettings(SearchCommand.ConfigurationSettings):
-                    clear_required_fields = ConfigurationSetting()
-                    distributed = ConfigurationSetting()
-                    generates_timeorder = ConfigurationSetting()
-                    generating = ConfigurationSetting()
-                    maxinputs = ConfigurationSetting()
-                    overrides_timeorder = ConfigurationSetting()
-                    required_fields = ConfigurationSetting()
-                    requires_preop = ConfigurationSetting()
-                    retainsevents = ConfigurationSetting()
-                    run_in_preview = ConfigurationSetting()
-                    streaming = ConfigurationSetting()
-                    streaming_preop = ConfigurationSetting()
-                    type = ConfigurationSetting()
-
-                    @classmethod
-                    def fix_up(cls, command_class):
-                        return
-
-            return ConfiguredSearchCommand.ConfigurationSettings
-
-        for name, values, error_values in (
-                ('clear_required_fields',
-                 (True, False),
-                 (None, 'anything other than a bool')),
-                ('distributed',
-                 (True, False),
-                 (None, 'anything other than a bool')),
-                ('generates_timeorder',
-                 (True, False),
-                 (None, 'anything other than a bool')),
-                ('generating',
-                 (True, False),
-                 (None, 'anything other than a bool')),
-                ('maxinputs',
-                 (0, 50000, sys.maxsize),
-                 (None, -1, sys.maxsize + 1, 'anything other than an int')),
-                ('overrides_timeorder',
-                 (True, False),
-                 (None, 'anything other than a bool')),
-                ('required_fields',
-                 (['field_1', 'field_2'], set(['field_1', 'field_2']), ('field_1', 'field_2')),
-                 (None, 0xdead, {'foo': 1, 'bar': 2})),
-                ('requires_preop',
-                 (True, False),
-                 (None, 'anything other than a bool')),
-                ('retainsevents',
-                 (True, False),
-                 (None, 'anything other than a bool')),
-                ('run_in_preview',
-                 (True, False),
-                 (None, 'anything other than a bool')),
-                ('streaming',
-                 (True, False),
-                 (None, 'anything other than a bool')),
-                ('streaming_preop',
-                 ('some unicode string', b'some byte string'),
-                 (None, 0xdead)),
-                ('type',
-                 # TODO: Do we need to validate byte versions of these strings?
-                 ('events', 'reporting', 'streaming'),
-                 ('eventing', 0xdead))):
-
-            for value in values:
-                settings_class = new_configuration_settings_class(name, value)
-
-                # Setting property exists
-                self.assertIsInstance(getattr(settings_class, name), property)
-
-                # Backing field exists on the settings class and it holds the correct value
-                backing_field_name = '_' + name
-                self.assertEqual(getattr(settings_class, backing_field_name), value)
-
-                settings_instance = settings_class(command=None)
-
-                # An instance gets its value from the settings class until a value is set on the instance
-
-                self.assertNotIn(backing_field_name, settings_instance.__dict__)
-                self.assertEqual(getattr(settings_instance, name), value)
-                self.assertEqual(getattr(settings_instance, backing_field_name), value)
-
-                setattr(settings_instance, name, value)
-
-                self.assertIn(backing_field_name, settings_instance.__dict__)
-                self.assertEqual(getattr(settings_instance, name), value)
-                self.assertEqual(settings_instance.__dict__[backing_field_name], value)
-
-            for value in error_values:
-                try:
-                    new_configuration_settings_class(name, value)
-                except Exception as error:
-                    self.assertIsInstance(error, ValueError,
-                                          f'Expected ValueError, not {type(error).__name__}({error}) for {name}={repr(value)}')
-                else:
-                    self.fail(f'Expected ValueError, not success for {name}={repr(value)}')
-
-                settings_class = new_configuration_settings_class()
-                settings_instance = settings_class(command=None)
-                self.assertRaises(ValueError, setattr, settings_instance, name, value)
-
     def test_new_configuration_setting(self):
 
         class Test:
@@ -338,128 +374,144 @@ class TestDecorators(TestCase):
 
         self.assertRaises(ValueError, Test.generating.fset, test, 'any type other than bool')
 
-    def test_option(self):
-
-        rebase_environment('app_with_logging_configuration')
-
-        presets = [
-            'logging_configuration=' + json_encode_string(environment.logging_configuration),
-            'logging_level="WARNING"',
-            'record="f"',
-            'show_configuration="f"']
-
-        command = TestSearchCommand()
-        options = command.options
-
-        options.reset()
-        missing = options.get_missing()
-        self.assertListEqual(missing, [option.name for option in options.values() if option.is_required])
-        self.assertListEqual(presets, [str(option) for option in options.values() if option.value is not None])
-        self.assertListEqual(presets, [str(option) for option in options.values() if str(option) != option.name + '=None'])
-
-        test_option_values = {
-            validators.Boolean: ('0', 'non-boolean value'),
-            validators.Code: ('foo == "bar"', 'bad code'),
-            validators.Duration: ('24:59:59', 'non-duration value'),
-            validators.Fieldname: ('some.field_name', 'non-fieldname value'),
-            validators.File: (__file__, 'non-existent file'),
-            validators.Integer: ('100', 'non-integer value'),
-            validators.Float: ('99.9', 'non-float value'),
-            validators.List: ('a,b,c', '"non-list value'),
-            validators.Map: ('foo', 'non-existent map entry'),
-            validators.Match: ('123-45-6789', 'not a social security number'),
-            validators.OptionName: ('some_option_name', 'non-option name value'),
-            validators.RegularExpression: ('\\s+', '(poorly formed regular expression'),
-            validators.Set: ('bar', 'non-existent set entry')}
-
-        for option in options.values():
-            validator = option.validator
-
-            if validator is None:
-                self.assertIn(option.name, ['logging_configuration', 'logging_level'])
-                continue
-
-            legal_value, illegal_value = test_option_values[type(validator)]
-            option.value = legal_value
-
-            self.assertEqual(
-                validator.format(option.value), validator.format(validator.__call__(legal_value)),
-                f"{option.name}={legal_value}")
-
-            try:
-                option.value = illegal_value
-            except ValueError:
-                pass
-            except BaseException as error:
-                self.assertFalse(
-                    f'Expected ValueError for {option.name}={illegal_value}, not this {type(error).__name__}: {error}')
-            else:
-                self.assertFalse(f'Expected ValueError for {option.name}={illegal_value}, not a pass.')
-
-        expected = {
-            'foo': False,
-            'boolean': False,
-            'code': 'foo == \"bar\"',
-            'duration': 89999,
-            'fieldname': 'some.field_name',
-            'file': str(repr(__file__)),
-            'integer': 100,
-            'float': 99.9,
-            'logging_configuration': environment.logging_configuration,
-            'logging_level': 'WARNING',
-            'map': 'foo',
-            'match': '123-45-6789',
-            'optionname': 'some_option_name',
-            'record': False,
-            'regularexpression': '\\s+',
-            'required_boolean': False,
-            'required_code': 'foo == \"bar\"',
-            'required_duration': 89999,
-            'required_fieldname': 'some.field_name',
-            'required_file': str(repr(__file__)),
-            'required_integer': 100,
-            'required_float': 99.9,
-            'required_map': 'foo',
-            'required_match': '123-45-6789',
-            'required_optionname': 'some_option_name',
-            'required_regularexpression': '\\s+',
-            'required_set': 'bar',
-            'set': 'bar',
-            'show_configuration': False,
-        }
-
-        self.maxDiff = None
-
-        tuplewrap = lambda x: x if isinstance(x, tuple) else (x,)
-        invert = lambda x: {v: k for k, v in x.items()}
-
-        for x in command.options.values():
-            # isinstance doesn't work for some reason
-            if type(x.value).__name__ == 'Code':
-                self.assertEqual(expected[x.name], x.value.source)
-            elif type(x.validator).__name__ == 'Map':
-                self.assertEqual(expected[x.name], invert(x.validator.membership)[x.value])
-            elif type(x.validator).__name__ == 'RegularExpression':
-                self.assertEqual(expected[x.name], x.value.pattern)
-            elif isinstance(x.value, TextIOWrapper):
-                self.assertEqual(expected[x.name], f"'{x.value.name}'")
-            elif not isinstance(x.value, (bool,) + (float,) + (str,) + (bytes,) + tuplewrap(int)):
-                self.assertEqual(expected[x.name], repr(x.value))
-            else:
-                self.assertEqual(expected[x.name], x.value)
-
-        expected = (
-            'foo="f" boolean="f" code="foo == \\"bar\\"" duration="24:59:59" fieldname="some.field_name" '
-            'file=' + json_encode_string(__file__) + ' float="99.9" integer="100" map="foo" match="123-45-6789" '
-            'optionname="some_option_name" record="f" regularexpression="\\\\s+" required_boolean="f" '
-            'required_code="foo == \\"bar\\"" required_duration="24:59:59" required_fieldname="some.field_name" '
-            'required_file=' + json_encode_string(__file__) + ' required_float="99.9" required_integer="100" required_map="foo" '
-            'required_match="123-45-6789" required_optionname="some_option_name" required_regularexpression="\\\\s+" '
-            'required_set="bar" set="bar" show_configuration="f"')
-
-        observed = str(command.options)
-
-        self.assertEqual(observed, expected)
+
+TEST_OPTION_VALUES = [
+    (validators.Boolean, '0', 'non-boolean value'),
+    (validators.Code, 'foo == "bar"', 'bad code'),
+    (validators.Duration, '24:59:59', 'non-duration value'),
+    (validators.Fieldname, 'some.field_name', 'non-fieldname value'),
+    (validators.File, __file__, 'non-existent file'),
+    (validators.Integer, '100', 'non-integer value'),
+    (validators.Float, '99.9', 'non-float value'),
+    (validators.Map, 'foo', 'non-existent map entry'),
+    (validators.Match, '123-45-6789', 'not a social security number'),
+    (validators.OptionName, 'some_option_name', 'non-option name value'),
+    (validators.RegularExpression, '\\s+', '(poorly formed regular expression'),
+    (validators.Set, 'bar', 'non-existent set entry')]
+
+
+@lru_cache(maxsize=None)
+def inverse_membership(validator):
+    return {v: k for k, v in validator.membership.items()}
+
+
+@pytest.fixture(scope="module")
+def search_command():
+    rebase_environment('app_with_logging_configuration')
+    return TestSearchCommand()
+
+
+def set_legal_option_values(command):
+    legal_values = {validator_type: legal_value for validator_type, legal_value, _ in TEST_OPTION_VALUES}
+
+    for option in command.options.values():
+        if option.validator is None:
+            assert option.name in ['logging_configuration', 'logging_level']
+            continue
+        option.value = legal_values[type(option.validator)]
+
+
+@pytest.mark.smoke
+@pytest.mark.parametrize('validator_type,legal_value,illegal_value', TEST_OPTION_VALUES)
+def test_option(search_command, validator_type, legal_value, illegal_value):
+
+    options = [option for option in search_command.options.values() if type(option.validator) is validator_type]
+    assert options, f'TestSearchCommand has no {validator_type.__name__} option'
+
+    for option in options:
+        validator = option.validator
+        option.value = legal_value
+
+        assert validator.format(option.value) == validator.format(validator.__call__(legal_value)), \
+            f"{option.name}={legal_value}"
+
+        with pytest.raises(ValueError):
+            option.value = illegal_value
+
+
+@pytest.mark.smoke
+def test_option_values():
+
+    # Other modules on the same worker may rebase the environment in between, so
+    # don't rely on the module-scoped command for the logging presets
+    rebase_environment('app_with_logging_configuration')
+    search_command = TestSearchCommand()
+
+    presets = [
+        'logging_configuration=' + json_encode_string(environment.logging_configuration),
+        'logging_level="WARNING"',
+        'record="f"',
+        'show_configuration="f"']
+
+    options = search_command.options
+
+    options.reset()
+    missing = options.get_missing()
+    assert missing == [option.name for option in options.values() if option.is_required]
+    assert presets == [str(option) for option in options.values() if option.value is not None]
+    assert presets == [str(option) for option in options.values() if str(option) != option.name + '=None']
+
+    set_legal_option_values(search_command)
+
+    expected = {
+        'foo': False,
+        'boolean': False,
+        'code': 'foo == \"bar\"',
+        'duration': 89999,
+        'fieldname': 'some.field_name',
+        'file': str(repr(__file__)),
+        'integer': 100,
+        'float': 99.9,
+        'logging_configuration': environment.logging_configuration,
+        'logging_level': 'WARNING',
+        'map': 'foo',
+        'match': '123-45-6789',
+        'optionname': 'some_option_name',
+        'record': False,
+        'regularexpression': '\\s+',
+        'required_boolean': False,
+        'required_code': 'foo == \"bar\"',
+        'required_duration': 89999,
+        'required_fieldname': 'some.field_name',
+        'required_file': str(repr(__file__)),
+        'required_integer': 100,
+        'required_float': 99.9,
+        'required_map': 'foo',
+        'required_match': '123-45-6789',
+        'required_optionname': 'some_option_name',
+        'required_regularexpression': '\\s+',
+        'required_set': 'bar',
+        'set': 'bar',
+        'show_configuration': False,
+    }
+
+    # Options whose values aren't compared as is, keyed by validator type
+    scalar_types = (bool, float, str, bytes, int)
+    value_formatters = {
+        validators.Code: lambda x: x.value.source,
+        validators.File: lambda x: f"'{x.value.name}'",
+        validators.Map: lambda x: inverse_membership(x.validator)[x.value],
+        validators.RegularExpression: lambda x: x.value.pattern}
+    default_formatter = lambda x: x.value if isinstance(x.value, scalar_types) else repr(x.value)
+
+    for x in search_command.options.values():
+        format_value = value_formatters.get(type(x.validator), default_formatter)
+        assert expected[x.name] == format_value(x), x.name
+
+    file = json_encode_string(__file__)
+
+    expected = (
+        'foo="f" boolean="f" code="foo == \\"bar\\"" duration="24:59:59" fieldname="some.field_name" '
+        f'file={file} float="99.9" integer="100" map="foo" match="123-45-6789" '
+        'optionname="some_option_name" record="f" regularexpression="\\\\s+" required_boolean="f" '
+        'required_code="foo == \\"bar\\"" required_duration="24:59:59" required_fieldname="some.field_name" '
+        f'required_file={file} required_float="99.9" required_integer="100" required_map="foo" '
+        'required_match="123-45-6789" required_optionname="some_option_name" required_regularexpression="\\\\s+" '
+        'required_set="bar" set="bar" show_configuration="f"')
+
+    observed = str(search_command.options)
+
+    assert observed == expected
 
 
 if __name__ == "__main__":
@@ -19,6 +19,7 @@ from random import randint
 from unittest import main, TestCase
 
 import os
+import re
 import sys
 import tempfile
 import pytest
@@ -282,6 +283,15 @@ class TestValidators(TestCase):
         self.assertEqual(validator.format(None), None)
         self.assertEqual(validator.format('123-45-6789'), '123-45-6789')
 
+        pattern = re.compile(r'\d{3}-\d{2}-\d{4}')
+        validator = validators.Match('social security number', pattern)
+        self.assertIs(validator.pattern, pattern)
+        self.assertEqual(validator.__call__('123-45-6789'), '123-45-6789')
+        self.assertRaises(ValueError, validator.__call__, 'foo')
+
+        # A precompiled pattern carries its own flags
+        self.assertRaises(ValueError, validators.Match, 'social security number', pattern, re.IGNORECASE)
+
     def test_option_name(self):
         pass
 
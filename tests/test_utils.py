@@ -1,7 +1,9 @@
 import unittest
+import io
 import os
+import tempfile
 from tests import testlib
-from utils import dslice
+from utils import dslice, parser, Parser
 
 TEST_DICT = {
     'username': 'admin',
@@ -73,6 +75,55 @@ class TestUtils(testlib.SDKTestCase):
         self.assertTrue(expected == dslice(TEST_DICT, *test_args))
 
 
+class ParserTest(unittest.TestCase):
+
+    # Options from a config file are overridden by later command line options
+    def test_config_callback(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.env', delete=False) as file:
+            file.write('# comment\nhost="confighost"\nport=9999\npassword=pa#ss\n')
+        self.addCleanup(os.remove, file.name)
+
+        result = parser().parse(['--config', file.name, '--port', '8000']).result
+        self.assertEqual(result.kwargs['host'], 'confighost')
+        self.assertEqual(result.kwargs['port'], '8000')
+        self.assertEqual(result.kwargs['password'], 'pa#ss')
+        self.assertNotIn('config', result.kwargs)
+
+    def test_interleaved_positionals(self):
+        result = parser().parse(['a', '--host', 'h', 'b', '--port', '1', 'c', '--', '--owner', 'd']).result
+        self.assertEqual(result.args, ['a', 'b', 'c', '--owner', 'd'])
+        self.assertEqual(result.kwargs['host'], 'h')
+        self.assertEqual(result.kwargs['port'], '1')
+        self.assertNotIn('owner', result.kwargs)
+
+    # Defaults are applied once, so later calls don't reset earlier values
+    def test_repeated_parse(self):
+        parser_ = parser()
+        parser_.parse(['--host', 'h', 'a'])
+        result = parser_.parse(['--port', '1', 'b']).result
+        self.assertEqual(result.args, ['a', 'b'])
+        self.assertEqual(result.kwargs['host'], 'h')
+        self.assertEqual(result.kwargs['port'], '1')
+        self.assertEqual(result.kwargs['scheme'], 'https')
+
+    def test_values_starting_with_dash(self):
+        result = parser().parse(['--password', '-weird', '--username=-admin', '--host', '--port']).result
+        self.assertEqual(result.kwargs['password'], '-weird')
+        self.assertEqual(result.kwargs['username'], '-admin')
+        self.assertEqual(result.kwargs['host'], '--port')
+        self.assertEqual(result.kwargs['port'], '8089')
+
+    def test_help_and_usage_formatting(self):
+        parser_ = Parser({'sure': {'flags': ['--sure'], 'help': '100% sure'}},
+                         prog='tool', usage='%prog [options] 100%', version='%prog 1.0')
+        output = io.StringIO()
+        parser_.print_help(output)
+        self.assertIn('usage: tool [options] 100%', output.getvalue())
+        self.assertIn('100% sure', output.getvalue())
+
+        self.assertRaises(TypeError, Parser, option_list=[])
+
+
 class FilePermissionTest(unittest.TestCase):
 
     def setUp(self):
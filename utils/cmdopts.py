@@ -14,10 +14,10 @@
 
 """Command line utilities shared by command line tools & unit tests."""
 
+from argparse import Action, ArgumentParser, RawDescriptionHelpFormatter, SUPPRESS
 from os import path
-from optparse import OptionParser
 import sys
-from dotenv import dotenv_values
+from types import SimpleNamespace
 
 __all__ = [ "error", "Parser", "cmdline" ]
 
@@ -27,60 +27,120 @@ def error(message, exitcode = None):
     if exitcode is not None: sys.exit(exitcode)
 
 
-class record(dict):
-    def __getattr__(self, name):
-        try: 
-            return self[name] 
-        except KeyError: 
-            raise AttributeError(name)
+# Maps optparse-style rule types onto argparse type converters
+_TYPES = { "string": str, "int": int, "float": float, "complex": complex }
 
-    def __setattr__(self, name, value):
-        self[name] = value
+# OptionParser arguments that have no argparse counterpart
+_UNSUPPORTED_KWARGS = [ "option_list", "option_class", "formatter" ]
 
 
-class Parser(OptionParser):
+def _prog_format(text, always = False):
+    """Translates optparse's '%prog' into argparse's '%(prog)s', escaping any
+       other '%' in text that argparse will %-format."""
+    if always or "%prog" in text:
+        text = text.replace("%", "%%").replace("%%prog", "%(prog)s")
+    return text
+
+
+class _CallbackAction(Action):
+    """Invokes an optparse-style ``callback(option, opt, value, parser)`` rule."""
+    def __init__(self, option_strings, dest, callback, owner, **kwargs):
+        Action.__init__(self, option_strings, dest, **kwargs)
+        self.callback = callback
+        self.owner = owner
+
+    def __call__(self, parser, namespace, values, option_string = None):
+        self.callback(self, option_string, values, self.owner)
+
+
+class Parser:
     def __init__(self, rules = None, **kwargs):
-        OptionParser.__init__(self, **kwargs)
-        self.dests = set({})
-        self.result = record({ 'args': [], 'kwargs': record() })
+        for key in _UNSUPPORTED_KWARGS:
+            if key in kwargs:
+                raise TypeError(f"Parser does not support the optparse '{key}' argument")
+        # Accept the OptionParser spellings of the remaining arguments
+        if 'add_help_option' in kwargs:
+            kwargs['add_help'] = kwargs.pop('add_help_option')
+        version = kwargs.pop('version', None)
+        if kwargs.get('usage') is not None:
+            kwargs['usage'] = _prog_format(kwargs['usage'], always=True)
+        if kwargs.get('description') is not None:
+            kwargs['description'] = _prog_format(kwargs['description'])
+        # Print epilogs verbatim, as the optparse based parser used to
+        kwargs.setdefault('formatter_class', RawDescriptionHelpFormatter)
+        self._parser = ArgumentParser(**kwargs)
+        self._parser.add_argument('args', nargs='*', help=SUPPRESS)
+        if version is not None:
+            self._parser.add_argument('--version', action='version', version=_prog_format(version))
+        # Flags that consume the next argument, see parse()
+        self._value_flags = set()
+        self.dests = frozenset()
+        self.result = SimpleNamespace(args=[], kwargs={})
         if rules is not None: self.init(rules)
 
     def init(self, rules):
         """Initialize the parser with the given command rules."""
-        # Initialize the option parser
+        # Initialize the argument parser
+        defaults = self.result.kwargs
         for dest in rules.keys():
             rule = rules[dest]
 
-            # Assign defaults ourselves here, instead of in the option parser
+            # Assign defaults ourselves here, instead of in the argument parser
             # itself in order to allow for multiple calls to parse (dont want
             # subsequent calls to override previous values with default vals).
             if 'default' in rule:
-                self.result['kwargs'][dest] = rule['default']
+                defaults[dest] = rule['default']
 
             flags = rule['flags']
-            kwargs = { 'action': rule.get('action', "store") }
+            action = rule.get('action', "store")
             # NOTE: Don't provision the parser with defaults here, per above.
-            for key in ['callback', 'help', 'metavar', 'type']:
-                if key in rule: kwargs[key] = rule[key]
-            self.add_option(*flags, dest=dest, **kwargs)
-
-            # Remember the dest vars that we see, so that we can merge results
-            self.dests.add(dest)
+            kwargs = { 'default': None }
+            if action == "callback":
+                kwargs.update(action=_CallbackAction, callback=rule['callback'], owner=self)
+                # Like optparse, a callback only takes a value if it has a type
+                if 'type' not in rule: kwargs['nargs'] = 0
+            else:
+                kwargs['action'] = action
+            if 'help' in rule:
+                # argparse %-formats help strings, optparse did not
+                kwargs['help'] = rule['help'].replace("%", "%%")
+            if 'metavar' in rule:
+                kwargs['metavar'] = rule['metavar']
+            if 'type' in rule:
+                kwargs['type'] = _TYPES.get(rule['type'], rule['type'])
+            self._parser.add_argument(*flags, dest=dest, **kwargs)
+
+            if action in ("store", "append") or 'type' in rule:
+                self._value_flags.update(flags)
+
+        # Remember the dest vars that we see, so that we can merge results;
+        # the set is read-only from here on.
+        self.dests = self.dests.union(rules.keys())
 
     # Load command options from '.env' file
     def load(self, filepath):
-        argv = []
         try:
-            filedata = dotenv_values(filepath)
-        except:
+            with open(filepath, encoding="utf-8") as file:
+                lines = file.readlines()
+        except OSError:
             error("Unable to open '%s'" % filepath, 2)
 
-        # update result kwargs value with .env file data
-        for key, value in filedata.items():
+        # update result kwargs value with .env file data; only the plain
+        # KEY=VALUE form (optionally quoted) with full-line comments is used.
+        dests = self.dests
+        kwargs = self.result.kwargs
+        for line in lines:
+            line = line.strip()
+            if not line or line.startswith('#'): continue
+            key, sep, value = line.partition('=')
+            if not sep: continue
+            key = key.strip()
             value = value.strip()
-            if len(value) == 0 or value is None: continue  # Skip blank value
-            elif key in self.dests:
-                self.result['kwargs'][key] = value
+            if len(value) > 1 and value[0] == value[-1] and value[0] in '"\'':
+                value = value[1:-1]
+            if len(value) == 0: continue  # Skip blank value
+            elif key in dests:
+                kwargs[key] = value
             else:
                 raise NameError("No such option --" + key)
 
@@ -99,17 +159,29 @@ class Parser(OptionParser):
 
     def parse(self, argv):
         """Parse the given argument vector."""
-        kwargs, args = self.parse_args(argv)
-        self.result['args'] += args
-        # Annoying that parse_args doesn't just return a dict
-        for dest in self.dests:
-            value = getattr(kwargs, dest)
-            if value is not None:
-                self.result['kwargs'][dest] = value
+        values = vars(self._parser.parse_intermixed_args(self._join_values(argv)))
+        self.result.args.extend(values.pop('args'))
+        self.result.kwargs.update((dest, value) for dest, value in values.items() if value is not None)
         return self
 
-    def format_epilog(self, formatter):
-        return self.epilog or ""
+    def _join_values(self, argv):
+        """Rewrites '--opt value' as '--opt=value' so that, as with optparse,
+           values starting with '-' are taken as values rather than options."""
+        result = []
+        argv = iter(argv)
+        for arg in argv:
+            if arg == "--":
+                result.append(arg)
+                result.extend(argv)
+                break
+            if arg in self._value_flags:
+                value = next(argv, None)
+                if value is not None: arg = f"{arg}={value}"
+            result.append(arg)
+        return result
+
+    def print_help(self, file = None):
+        self._parser.print_help(file)
 
 
 def cmdline(argv, rules=None, config=None, **kwargs):